@@ -1,9 +1,9 @@
+import sys
 from collections.abc import Callable, Mapping
-from copy import deepcopy, copy
+from copy import copy
 from dataclasses import dataclass
-from functools import partial
-from itertools import zip_longest
-from typing import Any, Literal, TypedDict, Type
+from functools import cached_property
+from typing import IO, Any, Iterator, Literal, TypedDict, Type
 
 from lxml import etree
 
@@ -20,36 +20,103 @@ class GameObjectProperty():
     help: str = ''
     
     def get_value(self, element: etree._Element):
-        value = None
+        return self.reader(element)
+    
+    def intern_names(self):
+        """Intern `tag` and `attrib` (including the ones of sub properties), so comparing them with the names from lxml can usually stop at an identity check. This has to be done before `reader` is first used.
+        """
+        if self.tag:
+            self.tag = sys.intern(self.tag)
         if self.attrib:
-            value = element.attrib.get(self.attrib, '')
+            self.attrib = sys.intern(self.attrib)
+        
+        if isinstance(self.type, dict):
+            for info in self.type.values():
+                if isinstance(info, GameObjectProperty):
+                    info.intern_names()
+    
+    @cached_property
+    def reader(self) -> Callable[[etree._Element], Any]:
+        """Function that reads the value of this property from an element. It's specialized for `type` when it's first used, so reading a value doesn't have to check the type every time.
+        """
+        attrib = self.attrib
+        type = self.type
+        default = self.default_factory
         
-        if callable(self.type):
-            value = self.type(element)
-        elif isinstance(self.type, dict):
-            value = {}
-            for key, info in self.type.items():
-                value[key] = info.get_value(element)
+        # values are only replaced with the default when they're missing, so
+        # values such as 0 or False are kept
+        if callable(type):
+            def read(element: etree._Element):
+                value = type(element)
+                return default() if value is None else value
+        elif isinstance(type, dict):
+            readers = tuple((key, info.reader) for key, info in type.items())
+            
+            def read(element: etree._Element):
+                return {key: read_value(element) for key, read_value in readers}
+        elif not attrib:
+            def read(element: etree._Element):
+                return default()
         else:
-            match self.type:
+            # the converters are bound as default arguments so they are local
+            # lookups in the reader
+            match type:
+                # the game only writes '0' and '1' for bools, so those don't
+                # need to be parsed as numbers
                 case 'bool':
-                    value = bool(strToInt(value))
+                    def read(element: etree._Element, to_int = strToInt):
+                        value = element.get(attrib)
+                        if not value:
+                            return default()
+                        if value == '1':
+                            return True
+                        if value == '0':
+                            return False
+                        return bool(to_int(value))
                 case 'rbool':
-                    value = not bool(strToInt(value))
+                    def read(element: etree._Element, to_int = strToInt):
+                        value = element.get(attrib)
+                        if not value:
+                            return default()
+                        if value == '1':
+                            return False
+                        if value == '0':
+                            return True
+                        return not to_int(value)
+                # most values are well formed, so they're parsed directly, and
+                # only fall back to the forgiving converters when that fails
                 case 'int':
-                    value = strToInt(value)
+                    def read(element: etree._Element, to_int = strToInt):
+                        value = element.get(attrib)
+                        if not value:
+                            return default()
+                        try:
+                            return int(value)
+                        except ValueError:
+                            return to_int(value)
                 case 'float':
-                    value = strToFloat(value)
+                    def read(element: etree._Element, to_float = strToFloat):
+                        value = element.get(attrib)
+                        if not value:
+                            return default()
+                        try:
+                            return float(value)
+                        except ValueError:
+                            return to_float(value)
                 case _:
-                    value = value
-        
-        if not value:
-            value = self.get_default()
+                    def read(element: etree._Element):
+                        return element.get(attrib) or default()
         
-        return value
+        return read
 
     def get_default(self):
-        default = deepcopy(self.default)
+        return self.default_factory()
+    
+    @cached_property
+    def default_factory(self) -> Callable[[], Any]:
+        """Function that creates the default value. Immutable defaults are shared, and containers are copied (one level deep), so objects never share a default they could mutate.
+        """
+        default = self.default
 
         if default is None:
             match self.type:
@@ -64,7 +131,13 @@ class GameObjectProperty():
                 case 'str':
                     default = ''
         
-        return default
+        if isinstance(default, (list, dict, set)):
+            if not default:
+                return default.__class__
+            
+            return default.copy
+        
+        return lambda: default
 
 class GameObject():
     CATEGORY = ''
@@ -76,6 +149,9 @@ class GameObject():
         )
     }
     OBJECTS: 'Mapping[str, GameObject]' = {}
+    TAG_INDEX: 'dict[str, list[tuple[str, GameObjectProperty]]]' = {}
+    _TAG_READERS: 'dict[str, tuple[tuple[str, Callable[[etree._Element], Any]], ...]]' = {}
+    _DEFAULTS: 'tuple[tuple[str, Callable[[], Any]], ...]' = ()
 
     FROM_MANIFEST: bool = False
     
@@ -87,6 +163,27 @@ class GameObject():
             cls = cls.OBJECTS[category]
 
         return cls(xml)
+    
+    @classmethod
+    def parse_stream(cls, file: str | IO) -> 'Iterator[GameObject]':
+        """Parse the game objects in a game data file (such as `gameobjectdata.xml`) one at a time while the file is being read, instead of loading the whole tree first. Elements are cleared once they've been parsed, so memory use stays flat.
+
+        Args:
+            file (str | IO): Game data file.
+
+        Yields:
+            GameObject: The parsed game objects.
+        """
+        for _, element in etree.iterparse(file, events = ('end',), tag = 'GameObject'):
+            parent = element.getparent()
+            category = parent.get('ID') if parent is not None else None
+            
+            yield cls.from_category(element, category)
+            
+            element.clear()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
 
     @classmethod
     def register_object(cls, object: 'Type[GameObject]', category: str | None = None):
@@ -102,85 +199,114 @@ class GameObject():
         cls.OBJECTS[category] = object
 
     def __init__(self, xml: etree._Element) -> None:
-        for prop, value in self.PROPERTIES.items():
-            if not isinstance(value, GameObjectProperty):
-                continue
+        data = self.__dict__
+        for prop, default_factory in self._DEFAULTS:
+            data[prop] = default_factory()
 
-            self.__setattr__(prop, value.get_default())
-
-        self._set_xml_data(xml)
+        # the dispatch is inlined here rather than calling `_set_xml_data`
+        # for every element, since this runs for every game object
+        tag_readers = self._TAG_READERS
+        
+        for prop, read in tag_readers.get(xml.tag, ()):
+            data[prop] = read(xml)
 
-        for element in xml:
-            self._set_xml_data(element)
+        # let lxml skip the children that don't have any properties
+        for element in xml.iterchildren(*tag_readers):
+            for prop, read in tag_readers.get(element.tag, ()):
+                data[prop] = read(element)
 
     def _set_xml_data(self, xml: etree._Element):
-        props: Mapping[str, GameObjectProperty] = {}
-        for key, prop_info in self.PROPERTIES.items():
-            if prop_info.tag == xml.tag:
-                props[key] = prop_info
-
-        if props == {}:
-            return
-
-        for prop, prop_info in props.items():
-            value = prop_info.get_value(xml)
-            self.__setattr__(prop, value)
+        # properties are plain attributes, so they can go straight into the
+        # instance dict instead of through __setattr__
+        data = self.__dict__
+        for prop, read in self._TAG_READERS.get(xml.tag, ()):
+            data[prop] = read(xml)
+    
+    @classmethod
+    def compile_properties(cls):
+        """Build the lookup tables used while parsing from `PROPERTIES`. This has to be called again whenever `PROPERTIES` changes.
+        """
+        cls.TAG_INDEX = {}
+        defaults = []
+        for prop, prop_info in cls.PROPERTIES.items():
+            if not isinstance(prop_info, GameObjectProperty):
+                continue
+            
+            prop_info.intern_names()
+            cls.TAG_INDEX.setdefault(prop_info.tag, []).append((prop, prop_info))
+            
+            # immutable defaults can live on the class, so they only need to
+            # be set on the object when the xml actually has a value
+            default = prop_info.get_default()
+            if isinstance(default, (list, dict, set)):
+                defaults.append((prop, prop_info.default_factory))
+            else:
+                setattr(cls, prop, default)
+        
+        cls._DEFAULTS = tuple(defaults)
+        cls._TAG_READERS = {
+            tag: tuple((prop, prop_info.reader) for prop, prop_info in props)
+            for tag, props in cls.TAG_INDEX.items()
+        }
     
     @classmethod
     def register_category_manifest(cls, file: str):
         tree = etree.parse(file)
         root = tree.getroot()
         
+        type_conversion: Mapping[str, GameObjectPropertyType] = {
+            'string': 'str',
+            'stringWithDefault': 'str',
+        }
         
-        for category_xml in root:
-            if category_xml.tag != 'GameObjectCategory':
-                continue
-            
-            category_name = category_xml.attrib.get('Name')
+        # a lot of attributes are identical between categories, so they can
+        # share one property (and its reader)
+        attribute_properties: dict[tuple, GameObjectProperty] = {}
+        
+        # lxml filters the children by tag, and `element.get` reads attributes
+        # without creating an `attrib` proxy
+        for category_xml in root.iterchildren('GameObjectCategory'):
+            category_name = category_xml.get('Name')
             
             if category_name in cls.OBJECTS:
                 continue
             
-            type_conversion: Mapping[str, GameObjectPropertyType] = {
-                'string': 'str',
-                'stringWithDefault': 'str',
-            }
-            
             PROPERTIES = {}
             
-            for parameter in category_xml:
-                if parameter.tag != 'Parameter':
-                    continue
-                
+            for parameter in category_xml.iterchildren('Parameter'):
                 property = GameObjectProperty(
-                    tag = parameter.attrib.get('Name'),
+                    tag = parameter.get('Name'),
                     type = {},
                 )
                 for attribute in parameter:
-                    name = attribute.attrib.get('Name', '')
-                    array = attribute.attrib.get('Array', None)
-                    attribute_type = attribute.attrib.get('Type', 'string')
-                    help = attribute.attrib.get('Tag', '')
-                    default_value = attribute.attrib.get('DefaultValue', None)
+                    name = attribute.get('Name', '')
+                    array = attribute.get('Array', None)
+                    attribute_type = attribute.get('Type', 'string')
+                    help = attribute.get('Tag', '')
+                    default_value = attribute.get('DefaultValue', None)
 
                     attribute_type = type_conversion.get(attribute_type, attribute_type)
 
-                    if array:
-                        attr = GameObjectProperty(
-                            type = GameObjectArray(
-                                tag = name,
+                    key = (name, attribute_type, bool(array), default_value, help)
+                    attr = attribute_properties.get(key)
+                    if attr is None:
+                        if array:
+                            attr = GameObjectProperty(
+                                type = GameObjectArray(
+                                    tag = name,
+                                    type = attribute_type,
+                                ),
+                                help = help,
+                                default = [],
+                            )
+                        else:
+                            attr = GameObjectProperty(
                                 type = attribute_type,
-                            ),
-                            help = help,
-                            default = [],
-                        )
-                    else:
-                        attr = GameObjectProperty(
-                            type = attribute_type,
-                            attrib = name,
-                            default = default_value,
-                            help = help,
-                        )
+                                attrib = name,
+                                default = default_value,
+                                help = help,
+                            )
+                        attribute_properties[key] = attr
                     
                     property.type[name] = attr
                 
@@ -193,6 +319,7 @@ class GameObject():
                 'FROM_MANIFEST': True,
                 **{key: None for key in PROPERTIES.keys()},
             })
+            category_class.compile_properties()
             
             cls.register_object(category_class)
     
@@ -208,18 +335,33 @@ class GameObject():
         
         
 
+GameObject.compile_properties()
+
+
+# id(type) -> (type, annotation) for dict types. The type is kept alive so its id can't be reused.
+_annotation_cache: dict[int, tuple[GameObjectPropertyType, Any]] = {}
+
 def game_object_type_to_annotation(type: GameObjectPropertyType):
     result = Any
 
     if callable(type):
         result = type.__annotations__.get('return')
     elif isinstance(type, dict):
+        cached = _annotation_cache.get(id(type))
+        if cached is not None:
+            return cached[1]
+        
         result = {}
         for key, info in type.items():
             if isinstance(info, GameObjectProperty):
                 result[key] = game_object_type_to_annotation(info.type)
 
-        result = TypedDict('GameObjectProperties', result)
+        if result and all(annotation is str for annotation in result.values()):
+            result = dict[str, str]
+        else:
+            result = TypedDict('GameObjectProperties', result)
+        
+        _annotation_cache[id(type)] = (type, result)
     else:
         match type:
             case 'bool':
@@ -244,19 +386,24 @@ def register_game_object[T](cls: T | Type[GameObject]) -> T:
     if not hasattr(cls, 'PROPERTIES') or not isinstance(cls.PROPERTIES, dict):
         cls.PROPERTIES = {}
     else:
-        cls.PROPERTIES = deepcopy(cls.PROPERTIES)
-
-    attrs = vars(cls).copy()
+        # the properties themselves are never changed per class, so they can
+        # be shared with the parent class
+        cls.PROPERTIES = cls.PROPERTIES.copy()
 
-    for attr, value in attrs.items():
-        if not isinstance(value, GameObjectProperty):
-            continue
+    # collected first, since the class dict gets changed below
+    properties = [
+        (attr, value) for attr, value in vars(cls).items()
+        if isinstance(value, GameObjectProperty)
+    ]
 
+    for attr, value in properties:
         cls.PROPERTIES[attr] = value
 
         setattr(cls, attr, None)
 
         cls.__annotations__[attr] = game_object_type_to_annotation(value.type)
+    
+    cls.compile_properties()
 
     return cls
     
@@ -267,35 +414,44 @@ def GameObjectArray(
     item_tag: str = 'Item',
     value_attrib: str = 'Value',
 ) -> Callable[[etree._Element], list[GameObjectPropertyType]]:
+    read_item = GameObjectProperty(
+        attrib = value_attrib,
+        type = type,
+    ).reader
+    
+    # only the items in the first `tag` element are used, the same as `find`
+    find_items = etree.XPath(f'./{tag}[1]/{item_tag}')
+    
     def get_xml_list(xml: etree._Element) -> list[GameObjectPropertyType]:
-        element = xml.find(tag)
-        
-        result = []
-        if element is not None:
-            for child in element:
-                if child.tag == item_tag:
-                    result.append(
-                        GameObjectProperty(
-                            attrib = value_attrib,
-                            type = type,
-                        ).get_value(child)
-                    )
-        
-        return result
+        return [read_item(child) for child in find_items(xml)]
     
     return get_xml_list
 
 def zip_game_properties(*properties: GameObjectProperty):
+    readers = tuple(p.reader for p in properties)
+    defaults = tuple(p.default_factory for p in properties)
+    
     def zip_properties(xml: etree._Element):
-        props = [value if (isinstance(value := p.get_value(xml), (list, tuple, set))) else [value] for p in properties]
-
-        result = []
+        columns = []
+        for read in readers:
+            value = read(xml)
+            columns.append(value if isinstance(value, (list, tuple, set)) else [value])
+        
+        # the columns usually have the same length, and the readers already
+        # fill in the defaults, so there's nothing to pad
+        length = len(columns[0]) if columns else 0
+        if all(len(column) == length for column in columns):
+            return [list(values) for values in zip(*columns)]
         
-        for values in zip_longest(*props, fillvalue = None):
-            result.append([
-                properties[index].get_default() if value == None else value for index, value in enumerate(values)
-            ])
+        # shorter columns are padded with the default of their property once,
+        # instead of checking every value of every row for padding
+        length = max(len(column) for column in columns)
+        for index, column in enumerate(columns):
+            missing = length - len(column)
+            if missing:
+                default = defaults[index]
+                columns[index] = [*column, *[default() for _ in range(missing)]]
         
-        return result
+        return [list(values) for values in zip(*columns)]
 
     return zip_properties
@@ -1,9 +1,3 @@
-from itertools import zip_longest
-from typing import Literal
-
-from lxml import etree
-
-from ..utils import strToInt
 from .gameobject import GameObject, GameObjectProperty, register_game_object, GameObjectArray
 
 @register_game_object
@@ -1,38 +1,17 @@
-from itertools import zip_longest
 from typing import Literal
 
 from lxml import etree
 
-from ..utils import strToInt
 from .gameobject import (GameObject, GameObjectArray, GameObjectProperty,
                          register_game_object, zip_game_properties)
 
+_FRIENDS_XPATH = etree.XPath('./Friend/*')
+
 
 @register_game_object
 class PonyObject(GameObject):
     CATEGORY = 'Pony'
     
-    @staticmethod
-    def _star_rewards(xml: etree._Element) -> list[dict[Literal['reward', 'amount'], str | int]]:
-        star_rewards = []
-        
-        ids = xml.find('ID') if xml.find('ID') is not None else etree.Element('ID')
-        amounts = xml.find('Amount') if xml.find('Amount') is not None else etree.Element('Amount')
-
-        for id, amount in zip_longest(
-            ids, amounts,
-            fillvalue = etree.Element('Item', value = ''),
-        ):
-            
-            reward = {
-                'reward': id.get('Value'),
-                'amount': strToInt(amount.get('Value')),
-            }
-            
-            star_rewards.append(reward)
-        
-        return star_rewards
-    
     name: str = GameObjectProperty(
         tag = 'Name',
         type = 'str',
@@ -164,7 +143,6 @@ class PonyObject(GameObject):
     
     star_rewards: list[dict[Literal['reward', 'amount'], str | int]] = GameObjectProperty(
         tag = 'StarRewards',
-        # type = _star_rewards,
         type = zip_game_properties(
             GameObjectProperty(
                 GameObjectArray(
@@ -220,16 +198,8 @@ class PonyObject(GameObject):
     )
     
     @staticmethod
-    def _friends(xml: etree._Element):
-        friends = []
-        for child in xml:
-            if child.tag == 'Friend':
-                for friend in child:
-                    id = friend.get('Value')
-                    if id:
-                        friends.append(id)
-        
-        return friends
+    def _friends(xml: etree._Element) -> list[str]:
+        return [id for friend in _FRIENDS_XPATH(xml) if (id := friend.get('Value'))]
 
     friends: list[str] = GameObjectProperty(
         tag = 'Friends',
@@ -4,7 +4,7 @@ import os
 import struct
 from collections.abc import Mapping
 from dataclasses import dataclass
-from typing import Annotated, BinaryIO, Literal
+from typing import Annotated, BinaryIO, ClassVar, Literal
 import csv
 
 import dataclasses_struct as dcs
@@ -27,20 +27,31 @@ class Header:
     frame_count: dcs.U32 = 0
     unknown: dcs.U32 = 4
 
-@dataclass
+@dataclass(slots = True)
 class Animation:
     name: str
     start: int
     end: int
     fps: float
 
-@dataclass
+@dataclass(slots = True)
 class BoneTransformation:
     position: tuple[float, float, float]
     scale: int
     rotation: tuple[float, float, float, float]
     
-    FORMAT: str = '3h1B4b'
+    # `FORMAT` used to be a dataclass field. With slots, a field can't keep a
+    # class level value, so it's a `ClassVar`, and is no longer an `__init__`
+    # argument or in `fields()` and `asdict()`.
+    FORMAT: ClassVar[str] = '3h1B4b'
+    STRUCT: ClassVar[struct.Struct] = struct.Struct('<' + FORMAT)
+
+# numpy version of `BoneTransformation.FORMAT`, so every frame can be read at once
+FRAME_DTYPE = numpy.dtype([
+    ('position', '<i2', (3,)),
+    ('scale', 'u1'),
+    ('rotation', 'i1', (4,)),
+])
 
 class Anim:
     MAGIC: bytes = b'RKFORMAT'
@@ -50,7 +61,8 @@ class Anim:
         self.header = Header()
         self.name = ''
         self.animations: dict[str, Animation] = {}
-        self.frames: list[list[BoneTransformation]] = []
+        self.frame_data: numpy.ndarray = numpy.zeros((0, 0), FRAME_DTYPE)
+        self._frames: list[list[BoneTransformation]] | None = None
         
         if file is not None:
             self.read(file)
@@ -61,7 +73,8 @@ class Anim:
             self.filename = os.path.abspath(file)
         with open_binary(file) as open_file:
             self.header = self._read_header(open_file)
-            self.frames = self._read_frames(open_file)
+            self.frame_data = self._read_frames(open_file)
+            self._frames = None
             self.animations = self._get_animation_list()
         
     def _read_header(self, file: BinaryIO):
@@ -80,15 +93,27 @@ class Anim:
             csv_name = os.path.join(os.path.dirname(self.filename), self.name + '.csv')
             if os.path.isfile(csv_name):
                 with open(csv_name, 'r', newline = '') as csvfile:
-                    reader = csv.DictReader(csvfile, ['name', 'start', 'end', 'fps'])
-                    animation_list = {
-                        row['name']: Animation(
-                            row['name'],
-                            strToInt(row['start']),
-                            strToInt(row['end']),
-                            strToFloat(row['fps']),
-                        ) for row in reader
-                    }
+                    animation_list = {}
+                    for row in csv.reader(csvfile):
+                        if not row:
+                            continue
+                        
+                        # missing columns are read as empty values
+                        if len(row) < 4:
+                            row += [''] * (4 - len(row))
+                        name, start, end, fps = row[:4]
+                        
+                        try:
+                            animation = Animation(name, int(start), int(end), float(fps))
+                        except ValueError:
+                            animation = Animation(
+                                name,
+                                strToInt(start),
+                                strToInt(end),
+                                strToFloat(fps),
+                            )
+                        
+                        animation_list[name] = animation
                 
                 return animation_list
             else:
@@ -96,22 +121,39 @@ class Anim:
                 
         return {}
     
-    def _read_frames(self, file: BinaryIO):
-        frames = []
-        for frame_index in range(self.header.frame_count):
-            frames.append([self._read_bone_transformation(file) for _ in range(self.header.bone_count)])
+    @property
+    def frames(self) -> list[list[BoneTransformation]]:
+        """Bone transformations for each frame. These are only created from `frame_data` when they're first used, since creating an object for every bone in every frame is a lot slower than reading them.
+        """
+        if self._frames is None:
+            frame_count, bone_count = self.frame_data.shape
+            
+            bones = [
+                BoneTransformation(values[0:3], values[3], values[4:8])
+                for values in BoneTransformation.STRUCT.iter_unpack(self.frame_data.tobytes())
+            ]
+            
+            self._frames = [
+                bones[index * bone_count:(index + 1) * bone_count]
+                for index in range(frame_count)
+            ]
         
-        return frames
+        return self._frames
     
-    def _read_bone_transformation(self, file: BinaryIO):
-        frame_data = struct.unpack(
-            BoneTransformation.FORMAT,
-            file.read(struct.calcsize(BoneTransformation.FORMAT)),
-        )
+    @frames.setter
+    def frames(self, frames: list[list[BoneTransformation]]):
+        self._frames = frames
+    
+    def _read_frames(self, file: BinaryIO) -> numpy.ndarray:
+        frame_count = self.header.frame_count
+        bone_count = self.header.bone_count
+        count = frame_count * bone_count
         
-        return BoneTransformation(
-            frame_data[0:3],
-            frame_data[3],
-            frame_data[4:8],
-        )
+        # read straight into the array, so the frames are only ever stored once
+        frames = numpy.empty((frame_count, bone_count), FRAME_DTYPE)
+        size = file.readinto(frames.view(numpy.uint8).reshape(-1))
+        if size != frames.nbytes:
+            raise EOFError(f'expected {frames.nbytes} bytes of frame data, but only got {size}')
+        
+        return frames
 
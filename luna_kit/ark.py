@@ -1,9 +1,11 @@
 import contextlib
 import hashlib
 import io
+import mmap
 import os
 import struct
 import sys
+import threading
 import warnings
 import zlib
 from collections import namedtuple
@@ -19,12 +21,29 @@ import zstandard
 from . import enums, types, xxtea
 from .file_utils import (PathOrBinaryFile, is_binary_file, is_text_file,
                          open_binary, get_filesize)
-from .utils import posix_path, read_ascii_string, trailing_slash
+from .utils import posix_path, trailing_slash
 
 
 def metadata_by_file_location(metadata: 'FileMetadata'):
     return metadata.file_location
 
+# zstd contexts can't be used from more than one thread at once, so each thread gets its own
+_zstd_contexts = threading.local()
+
+def _get_decompresser() -> zstandard.ZstdDecompressor:
+    try:
+        return _zstd_contexts.decompresser
+    except AttributeError:
+        decompresser = _zstd_contexts.decompresser = zstandard.ZstdDecompressor()
+        return decompresser
+
+def _get_compresser() -> zstandard.ZstdCompressor:
+    try:
+        return _zstd_contexts.compresser
+    except AttributeError:
+        compresser = _zstd_contexts.compresser = zstandard.ZstdCompressor(level = 9)
+        return compresser
+
 @dcs.dataclass()
 class Header():
     file_count: dcs.U32 = 0
@@ -34,6 +53,7 @@ class Header():
     # unknown: Annotated[bytes, 20] = b''
 
 HEADER_FORMAT = "3I"
+HEADER_SIZE = dcs.get_struct_size(Header)
 
 
 @dcs.dataclass()
@@ -89,29 +109,31 @@ class FileMetadata:
     
     def pack(self):
         self.__save_original()
-        return _FileMetadataStruct(
-            filename = self.filename.encode('ascii', errors = 'ignore'),
-            pathname = self.pathname.encode('ascii', errors = 'ignore'),
-            file_location = self.file_location,
-            original_filesize = self.original_filesize,
-            compressed_size = self.compressed_size,
-            encrypted_nbytes = self.encrypted_nbytes,
-            timestamp = self.timestamp,
-            md5sum = self.md5sum,
-            priority = self.priority,
-        ).pack()
+        return FILE_METADATA_STRUCT.pack(
+            self.filename.encode('ascii', errors = 'ignore'),
+            self.pathname.encode('ascii', errors = 'ignore'),
+            self.file_location,
+            self.original_filesize,
+            self.compressed_size,
+            self.encrypted_nbytes,
+            self.timestamp,
+            self.md5sum,
+            self.priority,
+        )
 
 
 FILE_METADATA_FORMAT = "128s128s5I16sI"
+FILE_METADATA_SIZE = dcs.get_struct_size(_FileMetadataStruct)
+# same layout as `_FileMetadataStruct`, without building a dataclass for every entry
+FILE_METADATA_STRUCT = struct.Struct(FILE_METADATA_FORMAT)
 
 class ARK():
-    KEY = [0x3d5b2a34, 0x923fff10, 0x00e346a4, 0x0c74902b]
+    KEY = (0x3d5b2a34, 0x923fff10, 0x00e346a4, 0x0c74902b)
     
     header: Header
     unknown_header_data: bytes
     _files: 'ARKMetadataCollection[FileMetadata]'
     
-    _decompresser = zstandard.ZstdDecompressor()
     
     def __init__(
         self,
@@ -129,6 +151,8 @@ class ARK():
         """
         self.__open_file: BinaryIO = None
         self.__close_file: bool = False
+        self.__mmap: mmap.mmap | None = None
+        self.__mapped_file: memoryview | None = None
         self._files = ARKMetadataCollection()
         self.header = Header()
         
@@ -144,6 +168,8 @@ class ARK():
     
     def load(self):
         self.open()
+        # mapped first, so the metadata is read out of the map too
+        self._map_file()
         self.read(self.__open_file)
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -165,11 +191,39 @@ class ARK():
             raise TypeError('cannot open file')
     
     def close(self):
+        self._unmap_file()
         if self.__close_file:
             if not self.__open_file.closed:
                 self.__open_file.close()
         self.__close_file = False
     
+    def _map_file(self):
+        """Memory map the open file, so reading a file out of it is just a slice instead of a seek and read. Files that can't be mapped, such as `BytesIO`, are read normally.
+        """
+        self._unmap_file()
+        
+        try:
+            self.__mmap = mmap.mmap(self.__open_file.fileno(), 0, access = mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            return
+        
+        self.__mapped_file = memoryview(self.__mmap)
+    
+    def _unmap_file(self):
+        # the map has to go before writing, since the file can be truncated
+        mapped_file, self.__mapped_file = self.__mapped_file, None
+        mmap_file, self.__mmap = self.__mmap, None
+        
+        # a slice of the map can still be alive somewhere (such as in a
+        # traceback), in which case the map gets closed once that's gone
+        try:
+            if mapped_file is not None:
+                mapped_file.release()
+            if mmap_file is not None:
+                mmap_file.close()
+        except BufferError:
+            pass
+    
     def __del__(self):
         print('closing file')
         self.close()
@@ -200,9 +254,10 @@ class ARK():
         if not is_binary_file(file):
             raise TypeError('file must be file-like object open in binary write mode')
         
+        self._unmap_file()
         file.seek(0)
         packed_files = self._pack_files()
-        self.header.metadata_offset = dcs.get_struct_size(Header) + len(self.unknown_header_data)
+        self.header.metadata_offset = HEADER_SIZE + len(self.unknown_header_data)
         for data, meta in packed_files:
             
             
@@ -211,13 +266,25 @@ class ARK():
         
         self._write_header(self.__open_file)
         self._write_files_and_metadata(self.__open_file, packed_files)
+        self._map_file()
     
     def read_file(self, file: FileMetadata):
         return self._get_file_data(file, self.__open_file)
+    
+    def iter_files(self) -> Iterator['ARKFile']:
+        """Read every file in the `.ark` file, one at a time. Nothing is kept around after it's yielded, so only the current file's data is in memory.
+
+        Yields:
+            ARKFile: File inside the `.ark` file.
+        """
+        for metadata in self._files:
+            yield self._get_file_data(metadata, self.__open_file)
 
     def add_file(self, file: 'ARKFile'):
         data, metadata = file.pack()
+        self._unmap_file()
         self._write_file(data, metadata, self.__open_file)
+        self._map_file()
     
     def _read_header(self, file: IO) -> Header:
         """Read the header of a `.ark` file.
@@ -231,7 +298,7 @@ class ARK():
         self.unknown_header_data = b''
         
         header: Header = Header.from_packed(
-            file.read(dcs.get_struct_size(Header))
+            file.read(HEADER_SIZE)
         )
         
         if header.ark_version == 3:
@@ -255,56 +322,79 @@ class ARK():
     def _read_metadata(self, file: IO) -> None | list[_FileMetadataStruct]:
         filesize: int = None
         
-        file.seek(0, os.SEEK_END)
+        mapped = file is self.__open_file and self.__mapped_file is not None
         
-        filesize = file.tell()
+        if mapped:
+            filesize = len(self.__mapped_file)
+        else:
+            file.seek(0, os.SEEK_END)
+            
+            filesize = file.tell()
         # print(filesize)
         
         if filesize < 0:
             raise TypeError('file size is negative, somehow...')
         
         metadata_size = xxtea.get_phdr_size(filesize - self.header.metadata_offset)
+        
+        if metadata_size < 0:
+            raise ValueError('metadata starts past the end of the file, it might be truncated')
         # print(f'metadata size: {metadata_size}')
         
-        raw_metadata_size = self.header.file_count * dcs.get_struct_size(_FileMetadataStruct)
+        raw_metadata_size = self.header.file_count * FILE_METADATA_SIZE
         # print(f'raw metadata size: {raw_metadata_size}')
         
         
-        file.seek(self.header.metadata_offset, os.SEEK_SET)
-        
-        
-        metadata = file.read(metadata_size)
+        view = None
+        if mapped:
+            view = metadata = self.__mapped_file[self.header.metadata_offset : self.header.metadata_offset + metadata_size]
+        else:
+            file.seek(self.header.metadata_offset, os.SEEK_SET)
+            
+            
+            metadata = file.read(metadata_size)
         
         # print(f'metadata: {int.from_bytes(metadata, 'little')}')
-        metadata = xxtea.decrypt(metadata, metadata_size // 4, self.KEY)
+        # decrypting copies the metadata, so the slice of the map can go
+        try:
+            metadata = xxtea.decrypt(metadata, metadata_size // 4, self.KEY)
+        finally:
+            if view is not None:
+                view.release()
         
         if self.header.ark_version == 1:
             raw_metadata = metadata
         elif self.header.ark_version == 3:
-            raw_metadata = self._decompresser.decompress(metadata, raw_metadata_size)
+            raw_metadata = _get_decompresser().decompress(metadata, raw_metadata_size)
             
             
 
-        metadata_size = dcs.get_struct_size(_FileMetadataStruct)
         result = ARKMetadataCollection()
-        for file_index in range(self.header.file_count):
-            offset = file_index * metadata_size
-            
-            
-            file_result: _FileMetadataStruct = _FileMetadataStruct.from_packed(
-                raw_metadata[offset : offset + metadata_size]
-            )
-            
+        for (
+            filename,
+            pathname,
+            file_location,
+            original_filesize,
+            compressed_size,
+            encrypted_nbytes,
+            timestamp,
+            md5sum,
+            priority,
+        ) in FILE_METADATA_STRUCT.iter_unpack(
+            memoryview(raw_metadata)[:self.header.file_count * FILE_METADATA_SIZE]
+        ):
             result.append(FileMetadata(
-                filename = read_ascii_string(file_result.filename),
-                pathname = read_ascii_string(file_result.pathname),
-                file_location = file_result.file_location,
-                original_filesize = file_result.original_filesize,
-                compressed_size = file_result.compressed_size,
-                encrypted_nbytes = file_result.encrypted_nbytes,
-                timestamp = file_result.timestamp,
-                md5sum = bytes.fromhex(file_result.md5sum.hex()),
-                priority = file_result.priority,
+                # the same as read_ascii_string, without the extra call for every entry
+                filename = filename.strip(b'\x00').decode('ascii', errors = 'ignore'),
+                # most files share a directory with others, so share the string too
+                pathname = sys.intern(pathname.strip(b'\x00').decode('ascii', errors = 'ignore')),
+                file_location = file_location,
+                original_filesize = original_filesize,
+                compressed_size = compressed_size,
+                encrypted_nbytes = encrypted_nbytes,
+                timestamp = timestamp,
+                md5sum = md5sum,
+                priority = priority,
             ))
 
         return result
@@ -320,25 +410,39 @@ class ARK():
             
 
     def _get_file_data(self, metadata: FileMetadata, file: BinaryIO):
-        file.seek(metadata.file_location, os.SEEK_SET)
+        size = metadata.encrypted_nbytes if metadata.encrypted_nbytes else metadata.compressed_size
         
-        file_data = file.read(metadata.encrypted_nbytes if metadata.encrypted_nbytes else metadata.compressed_size)
+        view = None
+        if file is self.__open_file and self.__mapped_file is not None:
+            view = file_data = self.__mapped_file[metadata.file_location : metadata.file_location + size]
+        else:
+            file.seek(metadata.file_location, os.SEEK_SET)
+            file_data = file.read(size)
 
         compressed = False
         encrypted = False
 
-        if (metadata.encrypted_nbytes) != 0:
-            encrypted = True
-            file_data = xxtea.decrypt(file_data, metadata.encrypted_nbytes // 4, self.KEY)
-        
-        if (metadata.compressed_size != metadata.original_filesize):
-            compressed = True
-            if self.header.ark_version == 1:
-                file_data = zlib.decompress(file_data)
-            elif self.header.ark_version == 3:
-                file_data = self._decompresser.decompress(file_data, metadata.original_filesize)
+        # the slice of the map has to be released even if decoding fails,
+        # otherwise the traceback keeps it alive and the map can't be closed
+        try:
+            if (metadata.encrypted_nbytes) != 0:
+                encrypted = True
+                file_data = xxtea.decrypt(file_data, metadata.encrypted_nbytes // 4, self.KEY)
+            
+            if (metadata.compressed_size != metadata.original_filesize):
+                compressed = True
+                if self.header.ark_version == 1:
+                    file_data = zlib.decompress(file_data)
+                elif self.header.ark_version == 3:
+                    file_data = _get_decompresser().decompress(file_data, metadata.original_filesize)
+            
+            if file_data is view:
+                file_data = bytes(view)
+        finally:
+            if view is not None:
+                view.release()
         
-        if hashlib.md5(file_data).hexdigest() != metadata.md5sum.hex():
+        if hashlib.md5(file_data).digest() != metadata.md5sum:
             warnings.warn(f'file "{posix_path(os.path.join(metadata.pathname, metadata.filename))}" hash does not match "{metadata.md5sum.hex()}"')
         
         return ARKFile(
@@ -356,7 +460,7 @@ class ARK():
             if len(self._files):
                 metadata.file_location = (self._files[-1].file_location + (self._files[-1].encrypted_nbytes or self._files[-1].compressed_size))
             else:
-                metadata.file_location = dcs.get_struct_size(self.header) + len(self.unknown_header_data)
+                metadata.file_location = HEADER_SIZE + len(self.unknown_header_data)
         if metadata.full_path not in self._files:
             metadata.file_location = self._files[-1].file_location + (self._files[-1].encrypted_nbytes or self._files[-1].compressed_size)
             self._files.append(metadata)
@@ -413,14 +517,12 @@ class ARK():
         print('metadata_offset', self.header.metadata_offset)
         file.seek(self.header.metadata_offset)
         print('current pos', file.tell())
-        expected_size = self.header.file_count * dcs.get_struct_size(_FileMetadataStruct)
+        expected_size = self.header.file_count * FILE_METADATA_SIZE
         file.truncate()
         if file.tell() != self.header.metadata_offset:
             self.header.metadata_offset = file.tell()
             self._write_header()
-        metadata_block = b''
-        for metadata in self._files:
-            metadata_block += metadata.pack()
+        metadata_block = b''.join([metadata.pack() for metadata in self._files])
         
         print('expected size:', expected_size)
         print('actual size:', len(metadata_block))
@@ -428,7 +530,7 @@ class ARK():
         if self.header.ark_version == 1:
             pass
         elif self.header.ark_version == 3:
-            metadata_block = zstandard.compress(metadata_block, 9)
+            metadata_block = _get_compresser().compress(metadata_block)
         
         print('compressed size', len(metadata_block))
         metadata_block = xxtea.encrypt(metadata_block, self.KEY)
@@ -437,14 +539,14 @@ class ARK():
         file.write(metadata_block)
 
     def _write_files_and_metadata(self, file: IO, packed_files: list[tuple[bytes, _FileMetadataStruct]]):
-        metadata_block: bytes = b''
         for data, meta in packed_files:
             file.seek(meta.file_location)
             file.write(data)
-            metadata_block += meta.pack()
+        
+        metadata_block = b''.join([meta.pack() for data, meta in packed_files])
         
         file.seek(self.header.metadata_offset)
-        metadata_block = zstandard.compress(metadata_block)
+        metadata_block = _get_compresser().compress(metadata_block)
         
         metadata_block = xxtea.encrypt(metadata_block, self.KEY)
         file.write(metadata_block)
@@ -453,7 +555,7 @@ class ARKFile():
     def __init__(
         self,
         filename: str,
-        data: bytes,
+        data: bytes | bytearray,
         compressed: bool = True,
         encrypted: bool = False,
         priority: int = 0,
@@ -462,10 +564,11 @@ class ARKFile():
 
         Args:
             filename (str): The filename to be used inside the `.ark` file.
-            data (bytes): File data.
+            data (bytes | bytearray): File data. This is used as is, not copied. Any other buffer (such as a `memoryview`) is copied into `bytes`.
         """
         self.fullpath = str(filename)
-        self.data: bytes = bytes(data)
+        # other buffers could be a view into the ark file's memory map, which has to be released
+        self.data: bytes | bytearray = data if isinstance(data, (bytes, bytearray)) else bytes(data)
         
         self.compressed = compressed
         self.encrypted = encrypted
@@ -491,7 +594,8 @@ class ARKFile():
         Returns:
             str: directory
         """
-        return trailing_slash(posix_path(os.path.dirname(self.fullpath)))
+        # fullpath is already in posix format
+        return trailing_slash(os.path.dirname(self._fullpath))
     @pathname.setter
     def pathname(self, name: str):
         self.fullpath = os.path.join(name, self.filename)
@@ -503,42 +607,59 @@ class ARKFile():
         Returns:
             str: full path
         """
-        self.fullpath = self._fullpath
         return self._fullpath
 
     @fullpath.setter
     def fullpath(self, path: str):
         self._fullpath = posix_path(path)
     
-    def save(self, path: str | None = None):
+    def save(self, path: str | None = None, made_dirs: set[str] | None = None):
         """Save this file to disk.
 
         Args:
             path (str | None, optional): Output filepath. Defaults to `fullpath`.
+            made_dirs (set[str] | None, optional): Directories that already exist. Pass the same set when saving a lot of files, so each directory only gets created once. Defaults to None.
         """
         if path == None:
             path = self.fullpath
         
-        os.makedirs(os.path.dirname(path), exist_ok = True)
-        
-        with open(path, 'wb') as file:
-            file.write(self.data)
+        dirname = os.path.dirname(path)
+        if dirname and (made_dirs is None or dirname not in made_dirs):
+            os.makedirs(dirname, exist_ok = True)
+            if made_dirs is not None:
+                made_dirs.add(dirname)
+        
+        # the data is already in one buffer, so skip the buffered file object and write it straight to the fd
+        fd = os.open(
+            path,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0),
+            0o666,
+        )
+        try:
+            data = memoryview(self.data)
+            # os.write can write less than it was given
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
     
     def pack(self) -> tuple[bytes, FileMetadata]:
         result = self.data
+        # the same as the `pathname` and `filename` properties, but only splitting once
+        pathname, filename = os.path.split(self._fullpath)
         metadata = FileMetadata(
-            filename = self.filename,
-            pathname = self.pathname,
+            filename = filename,
+            pathname = trailing_slash(pathname),
             file_location = -1,
             original_filesize = len(result),
             compressed_size = 0,
             encrypted_nbytes = 0,
             timestamp = 0,
-            md5sum = bytes.fromhex(hashlib.md5(result).hexdigest()),
+            md5sum = hashlib.md5(result).digest(),
             priority = self.priority,
         )
         if self.compressed:
-            result = zstandard.compress(result, 9)
+            result = _get_compresser().compress(result)
             metadata.compressed_size = len(result)
 
         if self.encrypted:
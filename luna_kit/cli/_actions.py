@@ -1,9 +1,50 @@
 import argparse
 from argparse import Action
 import glob
+import itertools
+import os
+from collections.abc import Iterable
 from typing import Any
 
 
+def file_stem(filename: str) -> str:
+    """Get the filename without the directory or extension, such as `foo` from `path/to/foo.ark`.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        str: The filename without the directory or extension.
+    """
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def glob_files(patterns: Iterable[str], recursive: bool = False) -> list[str]:
+    """Expand glob patterns into a list of files, in the order the patterns were given. Files matched by more than one pattern are only included once.
+
+    Args:
+        patterns (Iterable[str]): Glob patterns.
+        recursive (bool, optional): Allow `**` to match any number of directories. Defaults to False.
+
+    Returns:
+        list[str]: Matching filenames.
+    """
+    seen: set[str] = set()
+    files: list[str] = []
+    
+    for filename in itertools.chain.from_iterable(
+        glob.iglob(pattern, recursive = recursive) for pattern in patterns
+    ):
+        # so `./a.ark` and `a.ark` are the same file
+        key = os.path.normcase(os.path.abspath(filename))
+        if key in seen:
+            continue
+        
+        seen.add(key)
+        files.append(filename)
+    
+    return files
+
+
 class GlobFiles(Action):
     def __call__(
         self,
@@ -25,7 +66,7 @@ class GlobFiles(Action):
                 include_hidden = True,
             ))
         
-        setattr(namespace, self.dest, result)
+        setattr(namespace, self.dest, list(dict.fromkeys(result)))
     
     def format_usage(self):
         return 'hello'
@@ -1,11 +1,213 @@
 import os
 from argparse import ArgumentParser, Namespace
 
-from rich.progress import Progress, track
-
 from ..console import console
+from ._actions import file_stem, glob_files
 from .cli import CLI, CLICommand
 
+# how many files each worker extracts at a time when a single `.ark` file is split between processes
+CHUNK_SIZE = 64
+
+
+def _extract_all(
+    ark_file,
+    output: str,
+    ignore_errors: bool = False,
+    show_progress: bool = True,
+    files: list | None = None,
+    verbose: bool = False,
+    extracted: list[str] | None = None,
+) -> list[str]:
+    from rich.progress import track
+    
+    failed = []
+    made_dirs: set[str] = set()
+    
+    if files is None:
+        files = ark_file.files
+    if show_progress:
+        files = track(
+            files,
+            console = console,
+            description = 'Extracting...',
+        )
+    
+    for file_metadata in files:
+        # printing every file costs more than extracting small ones
+        if show_progress and verbose:
+            console.print(f'extracting: [yellow]{file_metadata.full_path}[/yellow]')
+        try:
+            file = ark_file.read_file(file_metadata)
+            file.save(os.path.join(output, file_metadata.full_path), made_dirs = made_dirs)
+            if extracted is not None:
+                extracted.append(file_metadata.full_path)
+        except Exception as e:
+            if ignore_errors:
+                failed.append(file_metadata.full_path)
+                if show_progress:
+                    console.print(f'[red]could not extract {file_metadata.full_path}[/red]')
+                continue
+            else:
+                e.add_note(f'file: {file_metadata.full_path}')
+                raise e
+    
+    return failed
+
+def _extract_file(filename: str, output: str, ignore_errors: bool = False, verbose: bool = False) -> tuple[list[str], list[str]]:
+    """Extract a single `.ark` file in a worker process. Worker processes can't print to the progress bar, so the extracted files are returned for the parent to print.
+
+    Args:
+        filename (str): Path to the `.ark` file.
+        output (str): Output directory.
+        ignore_errors (bool, optional): Skip files that could not be extracted. Defaults to False.
+        verbose (bool, optional): Return the files that were extracted. Defaults to False.
+
+    Returns:
+        tuple[list[str], list[str]]: Files that were extracted (empty unless `verbose`), and files that could not be extracted.
+    """
+    from ..ark import ARK
+    
+    extracted = [] if verbose else None
+    with ARK(filename) as ark_file:
+        failed = _extract_all(ark_file, output, ignore_errors, show_progress = False, extracted = extracted)
+    
+    return extracted or [], failed
+
+def _extract_files(filenames: list[str], output: str, ignore_errors: bool = False, verbose: bool = False) -> dict[str, tuple[list[str], list[str]]]:
+    """Extract `.ark` files one after another into the same output directory. This is the worker used when extracting multiple `.ark` files in parallel. Every `.ark` file going to the same output directory is given to the same worker, so they're always extracted in the same order, and never written at the same time.
+
+    Args:
+        filenames (list[str]): Paths to the `.ark` files, in the order to extract them.
+        output (str): Output directory.
+        ignore_errors (bool, optional): Skip files that could not be extracted. Defaults to False.
+        verbose (bool, optional): Return the files that were extracted. Defaults to False.
+
+    Returns:
+        dict[str, tuple[list[str], list[str]]]: Files that were extracted (empty unless `verbose`), and files that could not be extracted, for each `.ark` file.
+    """
+    return {
+        filename: _extract_file(filename, output, ignore_errors, verbose) for filename in filenames
+    }
+
+def _extract_ark(filename: str, output: str, ignore_errors: bool = False, verbose: bool = False) -> list[str]:
+    """Extract a single `.ark` file in this process, splitting its files between processes when it's big enough to be worth it.
+
+    Args:
+        filename (str): Path to the `.ark` file.
+        output (str): Output directory.
+        ignore_errors (bool, optional): Skip files that could not be extracted. Defaults to False.
+        verbose (bool, optional): Print each file as it's extracted. Defaults to False.
+
+    Returns:
+        list[str]: Files that could not be extracted.
+    """
+    from ..ark import ARK
+    
+    with ARK(filename) as ark_file:
+        file_count = ark_file.header.file_count
+        # only worth starting processes with more than one chunk and more than one core
+        parallel = file_count > CHUNK_SIZE and (os.cpu_count() or 1) > 1
+        if not parallel:
+            return _extract_all(ark_file, output, ignore_errors, verbose = verbose)
+    
+    return _extract_chunks(filename, file_count, output, ignore_errors, verbose)
+
+_worker_ark = None
+_worker_files = None
+
+def _open_worker_ark(filename: str):
+    """Open the `.ark` file once in each worker process, so every chunk of files doesn't have to decrypt the metadata again.
+
+    Args:
+        filename (str): Path to the `.ark` file.
+    """
+    global _worker_ark, _worker_files
+    from ..ark import ARK
+    
+    _worker_ark = ARK(filename)
+    _worker_ark.load()
+    _worker_files = _worker_ark.files
+
+def _extract_chunk(start: int, stop: int, output: str, ignore_errors: bool = False, verbose: bool = False) -> tuple[list[str], list[str]]:
+    """Extract a slice of the files in the `.ark` file opened by `_open_worker_ark`.
+
+    Args:
+        start (int): Index of the first file.
+        stop (int): Index after the last file.
+        output (str): Output directory.
+        ignore_errors (bool, optional): Skip files that could not be extracted. Defaults to False.
+        verbose (bool, optional): Return the files that were extracted. Defaults to False.
+
+    Returns:
+        tuple[list[str], list[str]]: Files that were extracted (empty unless `verbose`), and files that could not be extracted.
+    """
+    extracted = [] if verbose else None
+    failed = _extract_all(
+        _worker_ark,
+        output,
+        ignore_errors,
+        show_progress = False,
+        files = _worker_files[start:stop],
+        extracted = extracted,
+    )
+    
+    return extracted or [], failed
+
+def _extract_chunks(filename: str, file_count: int, output: str, ignore_errors: bool = False, verbose: bool = False) -> list[str]:
+    """Extract a single `.ark` file by splitting its files between processes. Decrypting is done in python, so threads wouldn't help.
+
+    Args:
+        filename (str): Path to the `.ark` file.
+        file_count (int): Number of files in the `.ark` file.
+        output (str): Output directory.
+        ignore_errors (bool, optional): Skip files that could not be extracted. Defaults to False.
+        verbose (bool, optional): Print the files of each chunk once it's extracted. Defaults to False.
+
+    Returns:
+        list[str]: Files that could not be extracted.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    from rich.progress import track
+    
+    failed = []
+    
+    with ProcessPoolExecutor(
+        initializer = _open_worker_ark,
+        initargs = (filename,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _extract_chunk,
+                start,
+                min(start + CHUNK_SIZE, file_count),
+                output,
+                ignore_errors,
+                verbose,
+            ) for start in range(0, file_count, CHUNK_SIZE)
+        ]
+        
+        try:
+            for future in track(
+                as_completed(futures),
+                total = len(futures),
+                console = console,
+                description = 'Extracting...',
+            ):
+                extracted, chunk_failed = future.result()
+                for file in extracted:
+                    console.print(f'extracted: [yellow]{file}[/yellow]')
+                failed.extend(chunk_failed)
+        except BaseException as e:
+            # stop at the first error like extracting in one process does,
+            # instead of extracting every other chunk before it shows up
+            executor.shutdown(wait = True, cancel_futures = True)
+            if failed:
+                e.add_note('also could not extract: ' + ', '.join(failed))
+            raise
+    
+    return failed
+
 
 @CLI.register_command
 class ARKParser(CLICommand):
@@ -39,69 +241,104 @@ class ARKParser(CLICommand):
             action = 'store_true',
             help = 'ignore errors',
         )
+        
+        parser.add_argument(
+            '-v', '--verbose',
+            dest = 'verbose',
+            action = 'store_true',
+            help = 'print each extracted file',
+        )
     
     @classmethod
     def run_command(cls, args: Namespace):
         import os
-        from glob import glob
+        from concurrent.futures import ProcessPoolExecutor, as_completed
 
-        from ..ark import ARK
+        from rich.progress import track
             
         output = './'
         
-        files = []
-        for pattern in args.files:
-            files.extend(glob(pattern))
+        # sorted, so .ark files extracting into the same folder always
+        # overwrite each other's files in the same order
+        files = sorted(glob_files(args.files))
         
-        files.sort()
+        if not files:
+            return
         
         if args.output:
             output = args.output
         elif len(files) == 1:
-            output = os.path.splitext(os.path.basename(args.files[0]))[0]
+            output = file_stem(files[0])
         
-        def extract_all(ark_file: ARK, output: str):
-            failed = []
-            
-            for file_metadata in track(
-                ark_file.files,
-                console = console,
-                description = 'Extracting...',
-            ):
-                console.print(f'extracting: [yellow]{file_metadata.full_path}[/yellow]')
-                try:
-                    file = ark_file.read_file(file_metadata)
-                    file.save(os.path.join(output, file_metadata.full_path))
-                except Exception as e:
-                    if args.ignore_errors:
-                        failed.append(file_metadata.full_path)
-                        console.print(f'[red]could not extract {file_metadata.full_path}[/red]')
-                        continue
-                    else:
-                        e.add_note(f'file: {file_metadata.full_path}')
-                        raise e
-            
-            return failed
+        failed: dict[str, list[str]] = {}
         
         if len(files) == 1:
-            with ARK(args.files[0]) as ark_file:
-                failed = extract_all(ark_file, output)
+            failed[files[0]] = _extract_ark(files[0], output, args.ignore_errors, verbose = args.verbose)
         else:
-            failed: dict[str, list[str]] = {}
+            separate_folders: bool = args.separate_folders
+            ignore_errors: bool = args.ignore_errors
+            join = os.path.join
+            
+            # .ark files that extract to the same folder can contain the same
+            # files, so they have to be extracted one after another
+            groups: dict[str, list[str]] = {}
             for filename in files:
                 filename: str
-                if args.separate_folders:
-                    path = os.path.join(output, os.path.splitext(os.path.basename(filename))[0])
+                if separate_folders:
+                    path = join(output, file_stem(filename))
                 else:
                     path = output
                 
-                
-                with ARK(filename) as ark_file:
-                    failed[filename] = extract_all(ark_file, path)
-                
-            if len(failed) > 0:
-                for arkfile, files in failed.items():
-                    for file in files:
-                        console.print(f'[red]failed to extract {file} from {arkfile}')
-                
-                        
+                groups.setdefault(path, []).append(filename)
+            
+            if len(groups) == 1:
+                [(path, filenames)] = groups.items()
+                for filename in filenames:
+                    failed[filename] = _extract_ark(filename, path, ignore_errors, verbose = args.verbose)
+                    console.print(f'extracted: [yellow]{filename}[/yellow]')
+            else:
+                with ProcessPoolExecutor() as executor:
+                    futures = {
+                        executor.submit(
+                            _extract_files,
+                            filenames,
+                            path,
+                            ignore_errors,
+                            args.verbose,
+                        ): filenames for path, filenames in groups.items()
+                    }
+                    
+                    def report(future):
+                        # only report the .ark files once they actually extracted
+                        for filename, (extracted, ark_failed) in future.result().items():
+                            for file in extracted:
+                                console.print(f'extracted: [yellow]{file}[/yellow]')
+                            console.print(f'extracted: [yellow]{filename}[/yellow]')
+                            failed[filename] = ark_failed
+                    
+                    reported = set()
+                    try:
+                        for future in track(
+                            as_completed(futures),
+                            total = len(futures),
+                            console = console,
+                            description = 'Extracting...',
+                        ):
+                            reported.add(future)
+                            report(future)
+                    except BaseException:
+                        # stop the groups that haven't started, instead of
+                        # extracting all of them before the error shows up
+                        executor.shutdown(wait = True, cancel_futures = True)
+                        # the groups that were already running still finished
+                        for future in futures:
+                            if future not in reported and not future.cancelled() and future.exception() is None:
+                                report(future)
+                        for arkfile, files in sorted(failed.items()):
+                            for file in files:
+                                console.print(f'[red]failed to extract {file} from {arkfile}')
+                        raise
+        
+        for arkfile, files in sorted(failed.items()):
+            for file in files:
+                console.print(f'[red]failed to extract {file} from {arkfile}')
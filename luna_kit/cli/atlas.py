@@ -1,5 +1,167 @@
 from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING
 from .cli import CLI, CLICommand
+from ._actions import glob_files
+
+if TYPE_CHECKING:
+    from rich.progress import Progress
+
+
+def _save_atlas(
+    file: str,
+    output: str | None = None,
+    search_folders: list[str] | None = None,
+    smart_search: bool = True,
+    override_existing: bool = False,
+    progress: 'Progress | None' = None,
+    threads: int | None = None,
+):
+    """Split a single `.texatlas` file and save the images.
+
+    Args:
+        file (str): Path to the `.texatlas` file.
+        output (str | None, optional): Output folder. Defaults to the folder the atlas image is in.
+        search_folders (list[str] | None, optional): Additional folders to look for the atlas images in. Defaults to None.
+        smart_search (bool, optional): Search the folders the `.texatlas` file is located in. Defaults to True.
+        override_existing (bool, optional): Override existing files. Defaults to False.
+        progress (Progress | None, optional): Progress bar to add a task for this atlas to. This can't be used in worker processes. Defaults to None.
+        threads (int | None, optional): Number of threads to save images with. Worker processes should use 1, since there's already a process for each core. Defaults to 4 per core, up to 32.
+    """
+    from ..texatlas import TexAtlas, Texture
+    import os
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from ..console import console
+    
+    if not os.path.isfile(file):
+        raise FileNotFoundError(f'file "{file}" does not exist or is a directory.')
+    
+    atlas = TexAtlas(
+        file,
+        search_folders = search_folders,
+        smart_search = smart_search,
+    )
+    
+    # directory -> names of the files in it. Listing each output directory once
+    # is a lot cheaper than calling `os.path.exists` for every image.
+    existing: dict[str, set[str]] = {}
+    existing_lock = threading.Lock()
+    
+    def get_existing(dirname: str) -> set[str]:
+        names = existing.get(dirname)
+        if names is not None:
+            return names
+        
+        with existing_lock:
+            names = existing.get(dirname)
+            if names is None:
+                os.makedirs(dirname, exist_ok = True)
+                if override_existing:
+                    names = set()
+                else:
+                    names = {entry.name for entry in os.scandir(dirname)}
+                existing[dirname] = names
+        
+        return names
+    
+    def get_filename(image: Texture):
+        if progress is not None:
+            console.print(image.filename)
+        if not output:
+            dir = image.dir
+        else:
+            dir = output
+        
+        return os.path.join(dir, image.filename)
+    
+    def save_overwrite(image: Texture):
+        filename = get_filename(image)
+        get_existing(os.path.dirname(filename))
+        
+        # save to a temporary file and move it into place, so another thread
+        # or process saving the same name can't leave a mix of both images
+        root, ext = os.path.splitext(filename)
+        temp = f'{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}'
+        try:
+            image.image.save(temp)
+            os.replace(temp, filename)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+    
+    def save_skip_existing(image: Texture):
+        filename = get_filename(image)
+        names = get_existing(os.path.dirname(filename))
+        
+        basename = os.path.basename(filename)
+        if basename in names:
+            return
+        names.add(basename)
+        
+        # the listing above is only a shortcut, other threads and processes
+        # can create the file after it, so the name is claimed with an
+        # exclusive create, which only one of them can win
+        try:
+            file = open(filename, 'xb')
+        except FileExistsError:
+            return
+        
+        try:
+            with file:
+                # PIL picks the format from the file's name
+                image.image.save(file)
+        except BaseException:
+            os.remove(filename)
+            raise
+    
+    save = save_overwrite if override_existing else save_skip_existing
+    
+    if threads is None:
+        # saving is mostly spent in PIL's encoders and disk writes, which release the GIL
+        threads = min(32, (os.cpu_count() or 1) * 4)
+    
+    if progress is not None:
+        task = progress.add_task(f'saving {file}', total = len(atlas.images))
+    
+    if threads <= 1:
+        for image in atlas.images:
+            save(image)
+            if progress is not None:
+                progress.advance(task)
+        return
+    
+    with ThreadPoolExecutor(max_workers = threads) as executor:
+        for _ in executor.map(save, atlas.images):
+            if progress is not None:
+                progress.advance(task)
+
+def _save_atlases(
+    files: list[str],
+    output: str | None = None,
+    search_folders: list[str] | None = None,
+    smart_search: bool = True,
+    override_existing: bool = False,
+):
+    """Split `.texatlas` files one after another. This is the worker used when splitting multiple `.texatlas` files in parallel, so it has to live at module level to be picklable.
+
+    Args:
+        files (list[str]): Paths to the `.texatlas` files, in the order to split them.
+        output (str | None, optional): Output folder. Defaults to the folder the atlas image is in.
+        search_folders (list[str] | None, optional): Additional folders to look for the atlas images in. Defaults to None.
+        smart_search (bool, optional): Search the folders the `.texatlas` file is located in. Defaults to True.
+        override_existing (bool, optional): Override existing files. Defaults to False.
+    """
+    for file in files:
+        _save_atlas(
+            file,
+            output = output,
+            search_folders = search_folders,
+            smart_search = smart_search,
+            override_existing = override_existing,
+            # there's already a process for each core
+            threads = 1,
+        )
 
 @CLI.register_command
 class AtlasCommand(CLICommand):
@@ -11,7 +173,7 @@ class AtlasCommand(CLICommand):
         parser.add_argument(
             'files',
             nargs = '+',
-            help = 'input .texatlas file(s)',
+            help = 'input .texatlas file(s). Without --output, atlases in different folders are split in parallel, and progress is only updated once all the atlases in a folder are done.',
         )
         
         parser.add_argument(
@@ -43,47 +205,73 @@ class AtlasCommand(CLICommand):
     
     @classmethod
     def run_command(cls, args: Namespace):
-        from ..texatlas import TexAtlas
-        from glob import glob
         import os
+        from concurrent.futures import ProcessPoolExecutor, as_completed
         from ..console import console
-        from rich.progress import track
+        from rich.progress import Progress
             
-        files: list[str] = []
-        
-        for pattern in args.files:
-            files.extend(glob(pattern, recursive = True))
+        files = glob_files(args.files, recursive = True)
         
+        if not files:
+            return
         
         search_folders: list[str] = args.search_folders
         if search_folders and len(search_folders) == 0:
             search_folders.append('.')
         
+        # atlases that can save to the same folder have to be saved one after
+        # another in the order they were given, so the same atlas always wins
+        # when they contain the same image. Without an output folder, images
+        # go next to the atlas image, which is usually next to the .texatlas file.
+        groups: dict[str, list[str]] = {}
         for file in files:
-            if not os.path.isfile(file):
-                raise FileNotFoundError(f'file "{file}" does not exist or is a directory.')
+            if args.output:
+                key = ''
+            else:
+                key = os.path.dirname(os.path.abspath(file))
+            groups.setdefault(key, []).append(file)
+        
+        # one progress bar for the whole run, instead of one per atlas
+        with Progress(
+            *Progress.get_default_columns(),
+            console = console,
+        ) as progress:
+            if len(groups) == 1:
+                for file in files:
+                    _save_atlas(
+                        file,
+                        output = args.output,
+                        search_folders = search_folders,
+                        smart_search = args.smart_search,
+                        override_existing = args.override_existing,
+                        progress = progress,
+                    )
+                return
             
-
-            atlas = TexAtlas(
-                file,
-                search_folders = search_folders,
-                smart_search = args.smart_search,
-            )
+            # the workers run in other processes, so they can only report
+            # back once a whole folder of atlases is done
+            task = progress.add_task('saving...', total = len(files))
             
-            for image in track(
-                atlas.images,
-                'saving...',
-                console = console,
-            ):
-                console.print(image.filename)
-                if not args.output:
-                    dir = image.dir
-                else:
-                    dir = args.output
-                
-                filename = os.path.join(dir, image.filename)
-                os.makedirs(os.path.dirname(filename), exist_ok = True)
+            with ProcessPoolExecutor() as executor:
+                futures = {
+                    executor.submit(
+                        _save_atlases,
+                        group,
+                        output = args.output,
+                        search_folders = search_folders,
+                        smart_search = args.smart_search,
+                        override_existing = args.override_existing,
+                    ): group for group in groups.values()
+                }
                 
-                if not args.override_existing and os.path.exists(filename):
-                    continue
-                image.image.save(filename)
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        for file in futures[future]:
+                            console.print(file)
+                            progress.advance(task)
+                except BaseException:
+                    # stop the folders that haven't started, instead of
+                    # saving all of them before the error shows up
+                    executor.shutdown(wait = True, cancel_futures = True)
+                    raise
@@ -28,23 +28,64 @@ class CLI():
         return command
     
     def build_args(self):
+        # only the command names and help are needed to list the commands,
+        # the arguments of each command are added in `build_command_args`
+        self.command_parsers: dict[str, ArgumentParser] = {}
         for command in self.COMMANDS.values():
-            command.build_args(self.subparser.add_parser(
+            self.command_parsers[command.COMMAND] = self.subparser.add_parser(
                 command.COMMAND,
                 help = command.HELP,
-            ))
-            
-    def parse_args(self, argv: list[str]):
-        if len(argv) < 1:
-            self.argparser.print_help()
-            sys.exit()
+            )
+    
+    def build_command_args(self, command_name: str | None = None):
+        """Add the arguments for a command. The arguments are built lazily, so `parse_args` only builds the command being run, and the parsers of the other commands never get built.
+
+        Args:
+            command_name (str | None, optional): Name of the command. Defaults to building every command that hasn't been built yet.
+        """
+        if command_name is None:
+            for command_name in list(self.command_parsers):
+                self.build_command_args(command_name)
+            return
+        
+        command = self.COMMANDS.get(command_name)
+        parser = self.command_parsers.pop(command_name, None)
+        if command is None or parser is None:
+            return
         
-        args = self.argparser.parse_args(argv)
+        command.build_args(parser)
+    
+    @property
+    def parser(self) -> ArgumentParser:
+        """The argument parser with the arguments of every command built."""
+        self.build_command_args()
+        return self.argparser
+            
+    def parse_args(self, argv: list[str] | None = None):
+        """Parse the arguments and run the command.
+
+        Args:
+            argv (list[str] | None, optional): Arguments, without the program name. Only the arguments of the command in `argv[0]` are built. Defaults to `sys.argv`, with the arguments of every command built.
+        """
+        if argv is None:
+            self.build_command_args()
+            args = self.argparser.parse_args()
+        else:
+            if len(argv) < 1 or argv[0] in ('-h', '--help'):
+                self.argparser.print_help()
+                sys.exit(0)
+            
+            self.build_command_args(argv[0])
+            
+            args = self.argparser.parse_args(argv)
         
         
         command = self.COMMANDS.get(args.command)
-        if command:
-            command.run_command(args)
+        if command is None:
+            self.argparser.print_help()
+            return
+        
+        command.run_command(args)
 
 class CLICommand():
     COMMAND = ''
@@ -1,4 +1,3 @@
-import charset_normalizer
 from .cli import CLI, CLICommand
 from ._actions import GlobFiles
 from ..console import console
@@ -35,6 +34,7 @@ class JSONCommand(CLICommand):
     @classmethod
     def run_command(cls, args):
         import json
+        import charset_normalizer
         
         for file in args.files:
             console.print(f'Formatting [yellow]{file}[/yellow]')
@@ -1,6 +1,8 @@
 from argparse import ArgumentParser, Namespace
 from .cli import CLI, CLICommand
-from ._actions import GlobFiles
+from ._actions import GlobFiles, file_stem
+
+_NO_ANSWERS = frozenset({'n', 'no', 'false', '0'})
 
 @CLI.register_command
 class LOCCommand(CLICommand):
@@ -57,10 +59,10 @@ class LOCCommand(CLICommand):
             if args.output:
                 output = args.output
             
-            output = output.format(name = os.path.splitext(os.path.basename(file))[0])
+            output = output.format(name = file_stem(file))
             
             if not args.override and os.path.exists(output):
-                if input(f'"{output}" already exists, do you want to override it? (Y/n): ').lower() in ['n', 'no', 'false', '0']:
+                if input(f'"{output}" already exists, do you want to override it? (Y/n): ').strip().lower() in _NO_ANSWERS:
                     continue
             
             loc_file = LOC(file)
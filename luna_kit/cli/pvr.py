@@ -1,5 +1,5 @@
 from .cli import CLI, CLICommand
-from ._actions import GlobFiles
+from ._actions import GlobFiles, file_stem
 
 from ..console import console
 @CLI.register_command
@@ -60,7 +60,7 @@ class PVRCommand(CLICommand):
         def save_image(file: str, ):
             pvr = PVR(file)
             output = args.output
-            name = os.path.splitext(os.path.basename(file))[0]
+            name = file_stem(file)
             if output:
                 output = safe_format(
                     output,
@@ -89,8 +89,7 @@ class SheetCommand(CLICommand):
         if args.loc:
             strings = LOC(args.loc).strings
         
-        def translate(string: str):
-            return strings.get(string, string)
+        translate = strings.get
         
         def parse_key(info: str):
             split = info.split(':')
@@ -120,35 +119,42 @@ class SheetCommand(CLICommand):
             elif isinstance(value, list):
                 value = args.delimiter.join([str(i) for i in value])
             elif isinstance(value, str):
-                value = translate(value)
+                value = translate(value, value)
             
             result[name] = value
             
             return result
         
         objects = object_data[args.category]
-        sheet = []
         
+        # the requested keys are the same for every object, so only parse them once
+        fields: list[tuple[list[str], list[str], str]] = []
+        if args.info is not None:
+            info: list[str] = args.info
+            columns: list[str] = args.columns or []
+            
+            columns = columns[:len(info)]
 
-        for object_id, object in objects.items():
+            for key, column in zip_longest(info, columns, fillvalue = None):
+                keys, extras = parse_key(key)
+                
+                if column is None:
+                    column = '.'.join(keys)
+                
+                fields.append((keys, extras, column))
+        
+        get_shopdata = object_data.get_object_shopdata
+        # only look up the shop data of every object when a field needs it
+        needs_shopdata = any('shop' in extras for _, extras, _ in fields)
+        
+        def get_row(object_id: str, object: dict):
             object_info = {}
             
-            info = None
-            
             if args.info is not None:
-                info: list[str] = args.info
-                columns: list[str] = args.columns or []
+                shopdata = get_shopdata(object_id) if needs_shopdata else None
                 
-                columns = columns[:len(info)]
-
-                for key, column in zip_longest(info, columns, fillvalue = None):
-                    keys, extras = parse_key(key)
-
-                    shopdata = None
-
-
+                for keys, extras, column in fields:
                     if 'shop' in extras:
-                        shopdata = object_data.get_object_shopdata(object_id)
                         if shopdata is None:
                             result = None
                         else:
@@ -156,26 +162,41 @@ class SheetCommand(CLICommand):
                     else:
                         result = get_items(keys, object)
                     
-                    if column is None:
-                        column = '.'.join(keys)
-                    
                     object_info.update(get_result(column, result))
             else:
                 for column, value in object.items():
                     object_info.update(get_result(column, value))
             
-            sheet.append(object_info)
-                        
+            return object_info
+        
+        sheet = [get_row(object_id, object) for object_id, object in objects.items()]
             
         os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok = True)
         
         match args.format:
             case 'csv':
                 import csv
+                # rows can have different columns (for example when a dict
+                # value has different keys), so use every column in order
+                fieldnames = list(dict.fromkeys(
+                    column for row in sheet for column in row
+                ))
                 with open(args.output, 'w', newline = '', encoding = 'utf-8') as file:
-                    writer = csv.DictWriter(file, sheet[0].keys())
+                    writer = csv.DictWriter(file, fieldnames)
                     writer.writeheader()
                     writer.writerows(sheet)
             case _: # json
-                with open(args.output, 'w', encoding = 'utf-8') as file:
-                    json.dump(sheet, file, indent = 2, ensure_ascii = False)
+                try:
+                    import orjson
+                except ImportError:
+                    orjson = None
+                
+                if orjson is not None:
+                    with open(args.output, 'wb') as file:
+                        file.write(orjson.dumps(
+                            sheet,
+                            option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                        ))
+                else:
+                    with open(args.output, 'w', encoding = 'utf-8') as file:
+                        json.dump(sheet, file, indent = 2, ensure_ascii = False)
@@ -2,8 +2,6 @@ from argparse import ArgumentParser, Namespace
 import glob
 import os
 
-import charset_normalizer
-
 from ..console import console
 from .cli import CLI, CLICommand
 
@@ -38,6 +36,7 @@ class XMLCommand(CLICommand):
         
     @classmethod
     def run_command(cls, args: Namespace):
+        import charset_normalizer
         from lxml import etree
         from bs4 import BeautifulSoup
         
@@ -107,6 +107,7 @@ class GameObjectData(dict):
                 raise FileNotFoundError('Cannot find shopdata.xml')
         
         self.shopdata = {}
+        self._shop_items: dict[str, ShopItem] = {}
         
         category_xml = etree.parse(category_manifest).getroot()
         shopdata_xml = etree.parse(shopdata).getroot()
@@ -137,30 +138,30 @@ class GameObjectData(dict):
                 continue
             
             category_data = {}
-            self.CATEGORY_DATA[category_xml.attrib.get('Name', '')] = category_data
+            self.CATEGORY_DATA[category_xml.get('Name', '')] = category_data
             
             for parameter_xml in category_xml:
                 if parameter_xml.tag != 'Parameter':
                     continue
                 
                 parameter_data = {
-                    'optional': strToBool(parameter_xml.attrib.get('Optional', 0)),
-                    'exclude': strToBool(parameter_xml.attrib.get('NotSave', 0)),
+                    'optional': strToBool(parameter_xml.get('Optional', 0)),
+                    'exclude': strToBool(parameter_xml.get('NotSave', 0)),
                     'attributes': {},
                 }
-                category_data[parameter_xml.attrib.get('Name', '')] = parameter_data
+                category_data[parameter_xml.get('Name', '')] = parameter_data
                 
                 for attribute_xml in parameter_xml:
                     if attribute_xml.tag != 'Attribute':
                         continue
                     
                     attribute_data = {
-                        'type': attribute_xml.attrib.get('Type', 'string'),
-                        'array_length': strToInt(attribute_xml.attrib.get('Array', 0)),
-                        'default': attribute_xml.attrib.get('DefaultValue'),
-                        'help': attribute_xml.attrib.get('Tag', ''),
+                        'type': attribute_xml.get('Type', 'string'),
+                        'array_length': strToInt(attribute_xml.get('Array', 0)),
+                        'default': attribute_xml.get('DefaultValue'),
+                        'help': attribute_xml.get('Tag', ''),
                     }
-                    parameter_data['attributes'][attribute_xml.attrib.get('Name', '')] = attribute_data
+                    parameter_data['attributes'][attribute_xml.get('Name', '')] = attribute_data
         
         return self.CATEGORY_DATA
 
@@ -207,7 +208,7 @@ class GameObjectData(dict):
                                 if attribute_xml is not None:
                                     for item in attribute_xml:
                                         attribute_data.append(self._parse_game_value(
-                                            item.attrib.get('Value', ''), 
+                                            item.get('Value', ''), 
                                             attribute_info['type'],
                                         ))
                                 elif attribute_info['default'] is not None:
@@ -218,7 +219,7 @@ class GameObjectData(dict):
                         else:
                             if parameter_xml is not None:
                                 attribute_data = self._parse_game_value(
-                                    parameter_xml.attrib.get(attribute_name, ''),
+                                    parameter_xml.get(attribute_name, ''),
                                     attribute_info['type'],
                                 )
                             else:
@@ -231,12 +232,13 @@ class GameObjectData(dict):
     
     def _parse_shopdata(self, shopdata: etree._Element):
         self.shopdata.clear()
+        self._shop_items.clear()
         
         for category_xml in shopdata:
             if category_xml.tag != 'ShopItemCategory':
                 continue
             
-            category_name = category_xml.attrib.get('Name')
+            category_name = category_xml.get('Name')
             category = ShopItemCategory(category_name, category_xml.attrib)
             self.shopdata[category_name] = category
 
@@ -244,9 +246,13 @@ class GameObjectData(dict):
                 if item_xml.tag != 'ShopItem':
                     continue
                 
-                item_id = item_xml.attrib.get('ID')
+                item_id = item_xml.get('ID')
                 item = ShopItem(item_id, category_name, item_xml.attrib)
                 category[item_id] = item
+            
+            # the first category an item is in wins
+            for item_id, item in category.items():
+                self._shop_items.setdefault(item_id, item)
                         
     def _parse_game_value(self, value: str, type: Literal['string', 'stringWithDefault', 'int', 'float', 'bool']):
         match type:
@@ -264,6 +270,4 @@ class GameObjectData(dict):
             if id in objects:
                 return objects[id]
     def get_object_shopdata(self, id: str):
-        for objects in self.shopdata.values():
-            if id in objects:
-                return objects[id]
+        return self._shop_items.get(id)
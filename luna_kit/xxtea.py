@@ -1,9 +1,11 @@
-import math
 import struct
-from ctypes import *
-from ctypes import c_uint32
+from collections.abc import Sequence
 from typing import Annotated
 
+DELTA = 0x9e3779b9
+# xxtea works on unsigned 32 bit words, so every result gets masked back down
+MASK = 0xffffffff
+
 
 def get_phdr_size(phdr_off: int):
     if (phdr_off & 3):
@@ -13,84 +15,53 @@ def get_phdr_size(phdr_off: int):
     return phdr_off
 
 
-def decrypt(src: bytes | bytearray, n: int, key: Annotated[list[int], 4]):
-    v = [c_uint(x) for x in struct.unpack(
+def decrypt(src: bytes | bytearray, n: int, key: Annotated[Sequence[int], 4]):
+    v = list(struct.unpack(
         f'{n}I',
         src,
-    )]
-
-    key: list[c_uint32] = [c_uint32(k) for k in key]
-
-    DELTA = 0x9e3779b9
-
-    y = c_uint32(0)
-    z = c_uint32(0)
-    p = 0
-    e = c_uint32(0)
-
-    def MX():
-        return (((z.value >> 5 ^ y.value << 2) + (y.value >> 3 ^ z.value << 4)) ^ ((sum.value ^ y.value) + (key[(p & 3) ^ e.value].value ^ z.value)))
+    ))
 
     rounds = 6 + (52 // n)
-    sum = c_uint32(rounds * DELTA)
-    y.value = v[0].value
+    sum = (rounds * DELTA) & MASK
+    y = v[0]
 
     while (rounds):
-        e.value = (sum.value >> 2) & 3
+        e = (sum >> 2) & 3
         for p in range(n - 1, 0, -1):
-            z.value = v[p-1].value
-            v[p].value -= MX()
-            y.value = v[p].value
-        p = 0
-        z.value = v[n - 1].value
-        v[0].value -= MX()
-        y.value = v[0].value
-        sum.value -= DELTA
+            z = v[p - 1]
+            y = v[p] = (v[p] - ((((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sum ^ y) + (key[(p & 3) ^ e] ^ z)))) & MASK
+        z = v[n - 1]
+        y = v[0] = (v[0] - ((((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sum ^ y) + (key[e] ^ z)))) & MASK
+        sum = (sum - DELTA) & MASK
 
         rounds -= 1
 
-    return b''.join([bytes(x) for x in v])
+    return struct.pack(f'{n}I', *v)
 
-def encrypt(src: bytes | bytearray, key: Annotated[list[int], 4]):
-    n = len(src) / 4
-    if n != math.floor(n):
-        src += b'\x00' * (4 - (len(src) % 4))
-        n = len(src) // 4
+def encrypt(src: bytes | bytearray, key: Annotated[Sequence[int], 4]):
+    if len(src) % 4:
+        src = src + b'\x00' * (4 - (len(src) % 4))
+    n = len(src) // 4
 
-    v = [c_uint(x) for x in struct.unpack(
+    v = list(struct.unpack(
         f'{n}I',
         src,
-    )]
-
-    key: list[c_uint32] = [c_uint32(k) for k in key]
-
-    DELTA = 0x9e3779b9
-
-    y = c_uint32(0)
-    z = c_uint32(0)
-    p = 0
-    e = c_uint32(0)
-
-    def MX():
-        return (((z.value >> 5 ^ y.value << 2) + (y.value >> 3 ^ z.value << 4)) ^ ((sum.value ^ y.value) + (key[(p & 3) ^ e.value].value ^ z.value)))
+    ))
 
     rounds = 6 + (52 // n)
-    sum = c_uint32(0)
-    z.value = v[n - 1].value
+    sum = 0
+    z = v[n - 1]
 
     while (rounds):
-        sum.value += DELTA
+        sum = (sum + DELTA) & MASK
         
-        e.value = (sum.value >> 2) & 3
+        e = (sum >> 2) & 3
         for p in range(0, n - 1, 1):
-            y.value = v[p + 1].value
-            v[p].value += MX()
-            z.value = v[p].value
-        p = n - 1
-        y.value = v[0].value
-        v[n - 1].value += MX()
-        z.value = v[n - 1].value
+            y = v[p + 1]
+            z = v[p] = (v[p] + ((((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sum ^ y) + (key[(p & 3) ^ e] ^ z)))) & MASK
+        y = v[0]
+        z = v[n - 1] = (v[n - 1] + ((((z >> 5) ^ (y << 2)) + ((y >> 3) ^ (z << 4))) ^ ((sum ^ y) + (key[((n - 1) & 3) ^ e] ^ z)))) & MASK
 
         rounds -= 1
 
-    return b''.join([bytes(x) for x in v])
+    return struct.pack(f'{n}I', *v)